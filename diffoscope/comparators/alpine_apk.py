@@ -16,118 +16,478 @@
 # You should have received a copy of the GNU General Public License
 # along with diffoscope.  If not, see <https://www.gnu.org/licenses/>.
 
+import io
 import os
 import re
+import gzip
+import mmap
+import zlib
+import shutil
+import hashlib
+import tarfile
 import logging
+import weakref
+import functools
+import threading
 import subprocess
+import concurrent.futures
 
 from diffoscope.difference import Difference
-from diffoscope.tempfiles import get_temporary_directory
-from diffoscope.tools import tool_required
-
+from diffoscope.exc import ContainerExtractionError, RequiredToolNotFound
+from diffoscope.tempfiles import (
+    get_named_temporary_file,
+    get_temporary_directory,
+)
+from diffoscope.tools import python_module_missing, tool_required
+
+try:
+    import rapidgzip
+except ImportError:
+    python_module_missing("rapidgzip")
+    rapidgzip = None
+
+from .symlink import Symlink
 from .utils.archive import Archive, ArchiveMember
 from .utils.command import Command
 from .utils.file import File
+from .utils.operation import Operation
 
 logger = logging.getLogger(__name__)
 
+# Read in 128 KiB chunks, matching the gzip.READ_BUFFER_SIZE that newer
+# CPython releases adopted; the historical 8 KiB chunking measurably slows
+# down decompression-bound reads.
+GZIP_BUFFER_SIZE = 128 * 1024
+
+# Copy members out of the expanded tar in 1 MiB blocks rather than
+# tarfile's default 16 KiB, trading allocator churn and syscalls for
+# sequential streaming.
+EXTRACT_BUFFER_SIZE = 1024 * 1024
+
+# rapidgzip has a per-file setup cost (it builds a block index before
+# decompressing regions in parallel), so only engage it for containers large
+# enough to amortise that.
+RAPIDGZIP_THRESHOLD = 4 * 1024 * 1024
+
+# Shared executor so that opening the two sides of a comparison can overlap;
+# the work is dominated by subprocess wall-time (v3) and zlib decompression,
+# both of which release the GIL. Threads are only spawned on first use.
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+def open_apk_v2(path):
+    """Open an APK v2 (concatenated gzip members) for streaming reads."""
+    if rapidgzip is not None and os.path.getsize(path) > RAPIDGZIP_THRESHOLD:
+        return rapidgzip.RapidgzipFile(path, parallelization=os.cpu_count())
+
+    buf = io.BufferedReader(
+        open(path, "rb", buffering=0), buffer_size=GZIP_BUFFER_SIZE
+    )
+    gz = gzip.GzipFile(fileobj=buf)
+    # Have GzipFile.close() also close our buffered file
+    gz.myfileobj = buf
+    return gz
+
+
+@functools.lru_cache(maxsize=8192)
+def _detect_apk_version(path, st_mtime_ns, st_size, st_ino):
+    # The stat fields are not used directly; they key the cache so that a
+    # path that changes on disk is re-examined.
+    #
+    # Only the first four bytes distinguish the formats, so read just those
+    # through a raw file descriptor; this sidesteps the Python file object
+    # machinery on a path that is hit for every classification candidate.
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            header = os.read(fd, 4)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+
+    if header.startswith(b"ADBd"):
+        return 3
+    if header.startswith(b"\x1f\x8b"):  # gzip magic
+        return 2
+    return None
+
+
+def _collect_members(base):
+    """Enumerate extracted files relative to base using os.scandir.
+
+    Unlike os.walk, this avoids re-stat'ing every entry (the DirEntry type
+    checks come straight from the readdir d_type) and builds the relative
+    paths during the descent instead of slicing absolute paths afterwards.
+    """
+    members = []
+    stack = [("", base)]
+
+    while stack:
+        rel, path = stack.pop()
+        with os.scandir(path) as it:
+            for entry in it:
+                entry_rel = f"{rel}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((f"{entry_rel}/", entry.path))
+                elif (
+                    entry.is_file(follow_symlinks=False) or entry.is_symlink()
+                ):
+                    # os.walk listed symlinks among the files, so keep
+                    # them enumerated; specialize() turns them into
+                    # Symlink members from the on-disk links
+                    members.append((entry.inode(), entry_rel))
+
+    # Ask the kernel to read the files back in inode order, which minimises
+    # seeks when they are subsequently opened for comparison. The member
+    # list itself stays lexicographic for reproducible output.
+    if hasattr(os, "posix_fadvise"):
+        for _, entry_rel in sorted(members):
+            try:
+                fd = os.open(os.path.join(base, entry_rel), os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+
+    return sorted(entry_rel for _, entry_rel in members)
+
 
 def detect_apk_version(path):
     """Detect Alpine APK version by examining the file header."""
     try:
-        with open(path, "rb") as f:
-            header = f.read(16)
-            if header.startswith(b"ADBd"):
-                return 3
-            elif header.startswith(b"\x1f\x8b"):  # gzip magic
-                return 2
-            else:
-                return None
-    except (IOError, OSError):
+        st = os.stat(path)
+    except OSError:
         return None
+    return _detect_apk_version(path, st.st_mtime_ns, st.st_size, st.st_ino)
 
 
-class AlpineApkV2Metadata(Command):
-    """Extract metadata from Alpine APK v2 packages using tar extraction."""
-    @tool_required("tar")
-    def cmdline(self):
-        # Extract control segment (second gzip stream) and show PKGINFO
-        return ["sh", "-c", f"gunzip -c '{self.path}' | tar -xOf - ./PKGINFO 2>/dev/null || echo 'No PKGINFO found'"]
+def _scratch_kwargs():
+    """Extra keyword arguments for temporary extraction space.
+
+    Prefer a tmpfs-backed area when one is writable, turning member writes
+    (and the fsync-heavy cleanup afterwards) into memory traffic rather
+    than disk I/O; otherwise fall back to the regular temporary directory.
+    """
+    if os.access("/dev/shm", os.W_OK):
+        return {"dir": "/dev/shm"}
+    return {}
+
+
+def _count_gzip_streams(path):
+    """Return an upper bound on the number of gzip members in path.
+
+    Counts occurrences of the gzip magic over a read-only mmap. The
+    deflate payload can contain the magic by coincidence, so this may
+    over-count, but every real member start is counted, so it never
+    under-counts.
+    """
+    try:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                count = 0
+                pos = mm.find(b"\x1f\x8b\x08")
+                while pos != -1:
+                    count += 1
+                    pos = mm.find(b"\x1f\x8b\x08", pos + 1)
+                return count
+    except (OSError, ValueError):
+        return 0
+
+
+def _prefix_digest(path, length=64 * 1024):
+    """Return a digest of the leading bytes of path."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(length)).digest()
+
+
+def _discard_expansion(name):
+    try:
+        os.unlink(name)
+    except OSError:
+        pass
+
+
+class _ExpandedApkV2:
+    """The decompressed tar stream of an APK v2, spooled to a temporary
+    file so that it is only ever inflated once per package."""
+
+    def __init__(self, path):
+        # delete=False so closing the write handle below does not remove
+        # the file; the finalizer (or clean_all_temp_files) unlinks it
+        with get_named_temporary_file(
+            suffix="alpine-apk-v2-tar", delete=False, **_scratch_kwargs()
+        ) as f:
+            with open_apk_v2(path) as gz:
+                shutil.copyfileobj(gz, f, GZIP_BUFFER_SIZE)
+            self.name = f.name
+
+        # Remove the spooled tar once the last consumer drops its
+        # reference rather than holding it until interpreter exit
+        self._finalizer = weakref.finalize(self, _discard_expansion, self.name)
+
+
+# Share expansions between the metadata operation and the container of the
+# same package without pinning them for the lifetime of the process: the
+# values are held weakly, so an expansion (and its spooled tar, which may
+# sit in tmpfs RAM) is discarded as soon as its last consumer goes away.
+_expansions = weakref.WeakValueDictionary()
+_expansions_lock = threading.Lock()
+
+
+def expand_apk_v2(path):
+    """Decompress path once, sharing the spooled tar between the metadata
+    operation and the container so a comparison pays for a single gzip
+    pass per package.
+
+    Consumers must keep a reference to the returned object for as long as
+    they use the file; it is removed once the last reference is dropped.
+    """
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size, st.st_ino)
+
+    with _expansions_lock:
+        expanded = _expansions.get(key)
+    if expanded is None:
+        # Decompress outside the lock; a racing duplicate is discarded by
+        # its finalizer when setdefault returns the winning instance
+        expanded = _ExpandedApkV2(path)
+        with _expansions_lock:
+            expanded = _expansions.setdefault(key, expanded)
+    return expanded
+
+
+class AlpineApkV2Metadata(Operation):
+    """Extract metadata from Alpine APK v2 packages in-process."""
+
+    def start(self):
+        logger.debug("Reading PKGINFO from %s", self.path)
+
+        # An APK v2 is a series of concatenated gzip members
+        # (signature/control/data); the shared expansion reads across the
+        # member boundaries, so the PKGINFO from the control segment appears
+        # as a regular entry in the combined tar stream.
+        self.returncode = 0
+        self._stdout = b""
+        self._mmap = None
+        self._lines = None
+
+        # The signature segment is optional but the control and data
+        # segments are mandatory, so a valid package has at least two
+        # gzip members; since the stream count never under-counts, fewer
+        # than two means there is certainly no control segment (and thus
+        # no PKGINFO) and the package does not need to be decompressed.
+        if _count_gzip_streams(self.path) < 2:
+            self._stdout = b"No PKGINFO found\n"
+            return
+
+        try:
+            self._expanded = expand_apk_v2(self.path)
+            with tarfile.open(self._expanded.name, "r:") as tf:
+                for member in tf:
+                    if member.name.lstrip("./") == "PKGINFO":
+                        # Serve the PKGINFO region straight out of a
+                        # mapping of the expanded tar, slicing per-line
+                        # memoryviews rather than copying the bytes into
+                        # the process heap
+                        with open(self._expanded.name, "rb") as f:
+                            self._mmap = mmap.mmap(
+                                f.fileno(), 0, access=mmap.ACCESS_READ
+                            )
+                        self._lines = self._mmap_lines(
+                            member.offset_data,
+                            member.offset_data + member.size,
+                        )
+                        # PKGINFO only occurs in the control segment,
+                        # which precedes the (much larger) data
+                        # segment, so stop scanning here
+                        break
+        except (OSError, EOFError, zlib.error, tarfile.TarError) as exc:
+            # zlib.error covers an invalid deflate body, which GzipFile
+            # raises as-is rather than wrapping in BadGzipFile
+            self.error_string = str(exc)
+            self.returncode = 1
+
+        if self._lines is None and not self._stdout:
+            self._stdout = b"No PKGINFO found\n"
+
+    def _mmap_lines(self, start, end):
+        view = memoryview(self._mmap)
+        lines = []
+        pos = start
+        while pos < end:
+            newline = self._mmap.find(b"\n", pos, end)
+            if newline == -1:
+                newline = end - 1
+            lines.append(view[pos : newline + 1])
+            pos = newline + 1
+        return lines
+
+    @property
+    def name(self):
+        return "apk-pkginfo"
+
+    def full_name(self, *args, **kwargs):
+        return f"apk-pkginfo {self.path}"
+
+    @property
+    def output(self):
+        if self._lines is not None:
+            return self._lines
+        return self._stdout.splitlines(True)
+
+    def should_show_error(self):
+        return self.returncode != 0
 
 
 class AlpineApkV3Metadata(Command):
     """Extract metadata from Alpine APK v3 packages using apk adbdump."""
+
     @tool_required("apk")
     def cmdline(self):
         return ["apk", "adbdump", self.path]
 
 
+class AlpineApkV2Symlink(Symlink, ArchiveMember):
+    """A symlink member, compared via its recorded target so that it never
+    needs to be materialised on disk."""
+
+    def __init__(self, container, member_name, destination):
+        ArchiveMember.__init__(self, container, member_name)
+        self._destination = destination
+
+    @property
+    def symlink_destination(self):
+        return self._destination
+
+    def is_symlink(self):
+        return True
+
+
 class AlpineApkV2Container(Archive):
     """Container for Alpine APK v2 packages (gzipped tar segments)."""
+
     @property
     def path(self):
         return self._path
 
-    @tool_required("tar")
     def open_archive(self):
         self._members = []
-        self._tmpdir = get_temporary_directory(suffix="alpine-apk-v2")
+        self._tarinfos = {}
+        self._dests = {}
+        self._extracted = {}
+        self._tmpdir = get_temporary_directory(
+            suffix="alpine-apk-v2", **_scratch_kwargs()
+        )
 
         logger.debug(
-            "Extracting APK v2 %s to %s", self.source.name, self._tmpdir.name
+            "Indexing APK v2 %s via %s", self.source.name, self._tmpdir.name
         )
 
-        # APK v2 format: Extract the data segment (third gzip stream)
-        # We use a shell command to skip the first two gzip streams
-        cmd = [
-            "sh", "-c",
-            f"gunzip -c '{self.source.path}' | "
-            f"gunzip -c | "
-            f"tar -xf - -C '{self._tmpdir.name}' 2>/dev/null || "
-            f"gunzip -c '{self.source.path}' | "
-            f"tar -xf - -C '{self._tmpdir.name}'"
-        ]
-        
-        try:
-            subprocess.check_call(cmd, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-        except subprocess.CalledProcessError as e:
-            logger.warning("Failed to extract APK v2 with complex method, trying simple extraction: %s", e)
-            # Fallback: try simple tar extraction
-            subprocess.check_call(
-                ["tar", "-xzf", self.source.path, "-C", self._tmpdir.name],
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-            )
-
-        # Collect all extracted files
-        for root, dirs, files in os.walk(self._tmpdir.name):
-            # Sort for reproducible output
-            dirs.sort()
-            files.sort()
-
-            for filename in files:
-                abspath = os.path.join(root, filename)
-                relpath = abspath[len(self._tmpdir.name) + 1:]
-                self._members.append(relpath)
+        # Kick the decompression off in the background; diffoscope opens
+        # both sides of a comparison before asking either for members, so
+        # the two expansions run in parallel and we only block in
+        # _ensure_opened() once a member is actually needed.
+        self._open_future = _executor.submit(self._index_archive)
 
         return self
 
+    def _index_archive(self):
+        # Index the shared, seekable expansion of the package so that
+        # individual members can be materialised on demand: diffoscope
+        # skips members whose content already matches, so most members of
+        # a typical comparison never need to be written out at all. The
+        # metadata operation consults the same expansion, so a comparison
+        # pays for one gzip pass per package in total.
+        #
+        # A corrupt package surfaces as ContainerExtractionError, which
+        # File.compare turns into a binary comparison with a comment.
+        try:
+            self._expanded = expand_apk_v2(self.source.path)
+            self._tar = tarfile.open(self._expanded.name, "r:")
+            for idx, member in enumerate(self._tar):
+                # Hard links are served through the normal extraction
+                # path (extractfile resolves them to their target's
+                # content); symlinks become Symlink members in
+                # get_member, as utils.libarchive does
+                if member.isfile() or member.issym() or member.islnk():
+                    name = member.name
+                    if name.startswith("./"):
+                        name = name[2:]
+                    # Materialise members at synthetic destinations
+                    # derived from the member index, as utils.libarchive
+                    # does, avoiding the need to sanitise hostile member
+                    # names ("../x", absolute paths)
+                    dst = os.path.join(
+                        self._tmpdir.name, str(idx // 4096), str(idx % 4096)
+                    )
+                    dst += os.path.splitext(name)[1]
+                    self._tarinfos[name] = member
+                    self._dests[name] = dst
+                    self._members.append(name)
+        except (OSError, EOFError, zlib.error, tarfile.TarError) as exc:
+            raise ContainerExtractionError(self.source.path, exc)
+
+        # Sort for reproducible output
+        self._members.sort()
+
+    def _ensure_opened(self):
+        if self._open_future is not None:
+            try:
+                self._open_future.result()
+            finally:
+                self._open_future = None
+
     def close_archive(self):
+        if getattr(self, "_open_future", None) is not None:
+            # Let any in-flight indexing finish before tearing down
+            try:
+                self._open_future.result()
+            except Exception:
+                pass
+            self._open_future = None
+        if hasattr(self, "_tar"):
+            self._tar.close()
         if hasattr(self, "_tmpdir"):
             self._tmpdir.cleanup()
 
     def get_member_names(self):
+        self._ensure_opened()
         return self._members
 
     def get_member(self, member_name):
+        self._ensure_opened()
+        tarinfo = self._tarinfos.get(member_name)
+        if tarinfo is not None and tarinfo.issym():
+            return AlpineApkV2Symlink(self, member_name, tarinfo.linkname)
         return ArchiveMember(self, member_name)
 
     def extract(self, member_name, dest_dir):
-        return os.path.join(self._tmpdir.name, member_name)
+        self._ensure_opened()
+        if member_name not in self._extracted:
+            tarinfo = self._tarinfos[member_name]
+            out_path = self._dests[member_name]
+            try:
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                with open(out_path, "wb") as out:
+                    shutil.copyfileobj(
+                        self._tar.extractfile(tarinfo),
+                        out,
+                        EXTRACT_BUFFER_SIZE,
+                    )
+                os.chmod(out_path, tarinfo.mode)
+                os.utime(out_path, (tarinfo.mtime, tarinfo.mtime))
+            except Exception as exc:
+                raise ContainerExtractionError(member_name, exc)
+            self._extracted[member_name] = out_path
+        return self._extracted[member_name]
 
 
 class AlpineApkV3Container(Archive):
     """Container for Alpine APK v3 packages (ADBd format)."""
+
     @property
     def path(self):
         return self._path
@@ -135,14 +495,26 @@ class AlpineApkV3Container(Archive):
     @tool_required("apk")
     def open_archive(self):
         self._members = []
-        self._tmpdir = get_temporary_directory(suffix="alpine-apk-v3")
+        self._tmpdir = get_temporary_directory(
+            suffix="alpine-apk-v3", **_scratch_kwargs()
+        )
 
         logger.debug(
             "Extracting APK v3 %s to %s", self.source.name, self._tmpdir.name
         )
 
-        # Extract package contents using apk --allow-untrusted extract
-        subprocess.check_call(
+        # As with the v2 container, run the extraction in the background so
+        # that the apk processes for both sides of a comparison overlap
+        self._open_future = _executor.submit(self._extract_archive)
+
+        return self
+
+    def _extract_archive(self):
+        # Extract package contents using apk --allow-untrusted extract. We
+        # never read apk's standard output, so send it to /dev/null rather
+        # than accumulating it in an unread pipe; stderr is still captured
+        # for the exception message on failure.
+        subprocess.run(
             [
                 "apk",
                 "--allow-untrusted",
@@ -151,83 +523,106 @@ class AlpineApkV3Container(Archive):
                 self._tmpdir.name,
                 self.source.path,
             ],
+            check=True,
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
-            stdout=subprocess.PIPE,
         )
 
         # Collect all extracted files
-        for root, dirs, files in os.walk(self._tmpdir.name):
-            # Sort for reproducible output
-            dirs.sort()
-            files.sort()
-
-            for filename in files:
-                abspath = os.path.join(root, filename)
-                relpath = abspath[len(self._tmpdir.name) + 1:]
-                self._members.append(relpath)
+        self._members = _collect_members(self._tmpdir.name)
 
-        return self
+    def _ensure_opened(self):
+        if self._open_future is not None:
+            try:
+                self._open_future.result()
+            finally:
+                self._open_future = None
 
     def close_archive(self):
+        if getattr(self, "_open_future", None) is not None:
+            # Let any in-flight extraction finish before tearing down
+            try:
+                self._open_future.result()
+            except Exception:
+                pass
+            self._open_future = None
         if hasattr(self, "_tmpdir"):
             self._tmpdir.cleanup()
 
     def get_member_names(self):
+        self._ensure_opened()
         return self._members
 
     def get_member(self, member_name):
         return ArchiveMember(self, member_name)
 
     def extract(self, member_name, dest_dir):
+        self._ensure_opened()
         return os.path.join(self._tmpdir.name, member_name)
 
 
 class AlpineApkFile(File):
     DESCRIPTION = "Alpine APK packages"
     FILE_EXTENSION_SUFFIX = {".apk"}
-    
+
     @classmethod
     def recognizes(cls, file):
         """Recognize both Alpine APK v2 and v3 formats."""
-        if not file.name.endswith('.apk'):
+        if not file.name.endswith(".apk"):
             return False
-        
-        # Check file header to determine format
-        try:
-            with open(file.path, "rb") as f:
-                header = f.read(16)
-                # v3 format starts with "ADBd"
-                if header.startswith(b"ADBd"):
-                    return True
-                # v2 format starts with gzip magic bytes
-                if header.startswith(b"\x1f\x8b"):
-                    return True
-        except (IOError, OSError):
-            pass
-        
-        return False
+
+        # Share the (cached) header sniff with as_container/compare_details
+        file._apk_version = detect_apk_version(file.path)
+
+        return file._apk_version is not None
+
+    @property
+    def apk_version(self):
+        if not hasattr(self, "_apk_version"):
+            self._apk_version = detect_apk_version(self.path)
+        return self._apk_version
 
     @property
     def as_container(self):
         """Return appropriate container class based on APK version."""
-        version = detect_apk_version(self.path)
+        # Memoize, as diffoscope may consult the container more than once
+        # per file and every rebuild would re-extract from scratch
+        if hasattr(self, "_as_container"):
+            return self._as_container
+
+        version = self.apk_version
         if version == 3:
-            return AlpineApkV3Container(self)
+            self._as_container = AlpineApkV3Container(self)
         elif version == 2:
-            return AlpineApkV2Container(self)
-        return None
+            self._as_container = AlpineApkV2Container(self)
+        else:
+            self._as_container = None
+        return self._as_container
 
     def compare_details(self, other, source=None):
         differences = []
 
+        # The signature and control segments sit at the very start of the
+        # package, so equal sizes and an identical leading 64 KiB imply
+        # identical metadata; skip the extraction entirely in that case.
+        try:
+            if os.path.getsize(self.path) == os.path.getsize(
+                other.path
+            ) and _prefix_digest(self.path) == _prefix_digest(other.path):
+                return differences
+        except OSError:
+            pass
+
         # Detect versions of both files
-        my_version = detect_apk_version(self.path)
+        my_version = self.apk_version
         other_version = detect_apk_version(other.path)
 
         # Add version information as comment
         if my_version and other_version:
             if my_version != other_version:
-                self.add_comment(f"APK version mismatch: {my_version} vs {other_version}")
+                self.add_comment(
+                    f"APK version mismatch: {my_version} vs {other_version}"
+                )
             else:
                 self.add_comment(f"Both files are APK v{my_version}")
 
@@ -239,24 +634,41 @@ class AlpineApkFile(File):
                     AlpineApkV3Metadata, self.path, other.path
                 )
             elif my_version == 2 and other_version == 2:
+                # Pin the shared expansions on the File objects so they
+                # survive from the metadata comparison through to the
+                # container phase of this comparison
+                try:
+                    self._apk_v2_expansion = expand_apk_v2(self.path)
+                    other._apk_v2_expansion = expand_apk_v2(other.path)
+                except (OSError, EOFError, zlib.error):
+                    pass
+
                 # Both are v2, extract PKGINFO from control segment
                 metadata_diff = Difference.from_operation(
                     AlpineApkV2Metadata, self.path, other.path
                 )
             else:
                 # Mixed versions or unknown, try both methods
+                # Only fall back on the failures the v3 route can
+                # legitimately produce; a bare except here would also
+                # swallow KeyboardInterrupt, leaving Ctrl-C to wait out
+                # the whole batch
                 try:
                     metadata_diff = Difference.from_operation(
                         AlpineApkV3Metadata, self.path, other.path
                     )
-                except:
+                except (
+                    RequiredToolNotFound,
+                    subprocess.CalledProcessError,
+                    FileNotFoundError,
+                ):
                     metadata_diff = Difference.from_operation(
                         AlpineApkV2Metadata, self.path, other.path
                     )
-            
+
             if metadata_diff is not None:
                 differences.append(metadata_diff)
-                
+
         except Exception as exc:
             logger.debug("Failed to extract APK metadata: %s", exc)
             self.add_comment(f"APK metadata extraction failed: {exc}")
@@ -0,0 +1,265 @@
+#
+# diffoscope: in-depth comparison of files, archives, and directories
+#
+# Copyright © 2025 Chris Lamb <lamby@debian.org>
+#
+# diffoscope is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# diffoscope is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with diffoscope.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import os
+import gzip
+import tarfile
+
+import pytest
+
+from diffoscope.comparators.binary import FilesystemFile
+from diffoscope.comparators.alpine_apk import (
+    AlpineApkFile,
+    AlpineApkV2Metadata,
+    detect_apk_version,
+)
+from diffoscope.comparators.utils.specialize import specialize_as
+
+from ..utils.data import data
+
+
+def alpine_apk_fixture(filename):
+    # The generic GzipFile comparator also matches APK v2 packages, so force
+    # the AlpineApkFile specialization rather than relying on the comparator
+    # ordering used by specialize()
+    return pytest.fixture(
+        lambda: specialize_as(AlpineApkFile, FilesystemFile(data(filename)))
+    )
+
+
+apk1 = alpine_apk_fixture("alpine1.apk")
+apk2 = alpine_apk_fixture("alpine2.apk")
+
+
+def gzip_member(entries, cut=False):
+    tbuf = io.BytesIO()
+    with tarfile.open(fileobj=tbuf, mode="w") as tf:
+        for name, content in entries:
+            ti = tarfile.TarInfo(name)
+            ti.size = len(content)
+            tf.addfile(ti, io.BytesIO(content))
+    raw = tbuf.getvalue()
+    if cut:
+        # Strip the end-of-archive blocks, as abuild does for the
+        # signature and control segments
+        while raw.endswith(b"\0" * 512):
+            raw = raw[:-512]
+    return gzip.compress(raw)
+
+
+def test_identification(apk1):
+    assert AlpineApkFile.recognizes(apk1)
+    assert isinstance(apk1, AlpineApkFile)
+
+
+def test_detect_version(apk1):
+    assert detect_apk_version(apk1.path) == 2
+    assert detect_apk_version(data("archive1.tar")) is None
+
+
+def test_detect_version_cached(apk1):
+    from diffoscope.comparators.alpine_apk import _detect_apk_version
+
+    _detect_apk_version.cache_clear()
+    detect_apk_version(apk1.path)
+    detect_apk_version(apk1.path)
+    assert _detect_apk_version.cache_info().hits >= 1
+
+
+def test_corrupt_apk(apk1, tmp_path):
+    # A truncated package must degrade to a binary comparison rather than
+    # leak EOFError out of File.compare
+    with open(data("alpine1.apk"), "rb") as f:
+        raw = f.read()
+    corrupt = tmp_path / "corrupt.apk"
+    corrupt.write_bytes(raw[:100])
+
+    other = specialize_as(AlpineApkFile, FilesystemFile(str(corrupt)))
+    difference = apk1.compare(other)
+    assert difference is not None
+
+
+def test_corrupt_apk_body(apk1, tmp_path):
+    # An invalid deflate body raises zlib.error (not BadGzipFile) from
+    # GzipFile; flip the first deflate byte of the data segment and check
+    # that this, too, degrades to a binary comparison
+    with open(data("alpine1.apk"), "rb") as f:
+        raw = bytearray(f.read())
+    raw[raw.rindex(b"\x1f\x8b\x08") + 10] ^= 0xFF
+    corrupt = tmp_path / "corrupt-body.apk"
+    corrupt.write_bytes(bytes(raw))
+
+    other = specialize_as(AlpineApkFile, FilesystemFile(str(corrupt)))
+    difference = apk1.compare(other)
+    assert difference is not None
+
+
+def test_no_differences(apk1):
+    difference = apk1.compare(apk1)
+    assert difference is None
+
+
+def test_count_gzip_streams(apk1):
+    from diffoscope.comparators.alpine_apk import _count_gzip_streams
+
+    assert _count_gzip_streams(apk1.path) == 3
+    assert _count_gzip_streams(data("text_ascii1")) == 0
+
+
+def test_single_decompression(apk1, apk2, monkeypatch):
+    from diffoscope.comparators import alpine_apk
+
+    calls = []
+    original = alpine_apk._ExpandedApkV2.__init__
+
+    def counting_init(self, path):
+        calls.append(path)
+        original(self, path)
+
+    alpine_apk._expansions.clear()
+    monkeypatch.setattr(alpine_apk._ExpandedApkV2, "__init__", counting_init)
+    apk1.compare(apk2)
+
+    # One gzip pass per package; the containers reuse the expansions
+    # created for the metadata comparison
+    assert len(calls) == 2
+
+
+def test_unsigned_apk_metadata(tmp_path):
+    # The signature segment is optional: an unsigned package has just the
+    # control and data members and must still yield its PKGINFO
+    control = gzip_member(
+        [("PKGINFO", b"pkgname = hello\npkgver = 1.0-r0\n")], cut=True
+    )
+    data_segment = gzip_member([("usr/bin/hello", b"hello\n")])
+    apk = tmp_path / "unsigned.apk"
+    apk.write_bytes(control + data_segment)
+
+    operation = AlpineApkV2Metadata(str(apk))
+    operation.start()
+    assert operation.returncode == 0
+    output = b"".join(bytes(x) for x in operation.output)
+    assert b"pkgver = 1.0-r0" in output
+
+
+def test_metadata_short_circuit(apk1, tmp_path):
+    import shutil
+
+    copy = tmp_path / "copy.apk"
+    shutil.copy(apk1.path, copy)
+    other = specialize_as(AlpineApkFile, FilesystemFile(str(copy)))
+
+    assert apk1.compare_details(other) == []
+
+
+def test_container_memoized(apk1):
+    assert apk1.as_container is apk1.as_container
+
+
+def test_lazy_extraction(apk1):
+    container = apk1.as_container
+    assert "usr/bin/hello" in container.get_member_names()
+
+    # Nothing is materialised until a member is actually requested
+    assert container._extracted == {}
+
+    path = container.extract("usr/bin/hello", None)
+    assert os.path.exists(path)
+
+
+def test_hostile_member_names(tmp_path):
+    name = "../../../../tmp/evil_escape.txt"
+    apk = tmp_path / "evil.apk"
+    apk.write_bytes(gzip_member([(name, b"payload\n")]))
+
+    container = specialize_as(
+        AlpineApkFile, FilesystemFile(str(apk))
+    ).as_container
+    assert name in container.get_member_names()
+
+    # Members are materialised at synthetic destinations, so a crafted
+    # name cannot write outside the container's temporary directory
+    path = os.path.realpath(container.extract(name, None))
+    tmpdir = os.path.realpath(container._tmpdir.name)
+    assert os.path.commonpath([tmpdir, path]) == tmpdir
+
+
+def test_collect_members_symlinks(tmp_path):
+    from diffoscope.comparators.alpine_apk import _collect_members
+
+    (tmp_path / "usr" / "bin").mkdir(parents=True)
+    (tmp_path / "usr" / "bin" / "real").write_bytes(b"x")
+    os.symlink("real", tmp_path / "usr" / "bin" / "link")
+
+    # Symlinks written by apk extract are enumerated alongside the
+    # regular files, as os.walk previously did
+    assert _collect_members(str(tmp_path)) == [
+        "usr/bin/link",
+        "usr/bin/real",
+    ]
+
+
+def apk_with_symlink(path, target):
+    control = gzip_member([("PKGINFO", b"pkgname = hello\n")], cut=True)
+    tbuf = io.BytesIO()
+    with tarfile.open(fileobj=tbuf, mode="w") as tf:
+        ti = tarfile.TarInfo("usr/bin/hello")
+        ti.size = 6
+        tf.addfile(ti, io.BytesIO(b"hello\n"))
+        link = tarfile.TarInfo("usr/bin/link")
+        link.type = tarfile.SYMTYPE
+        link.linkname = target
+        tf.addfile(link)
+    path.write_bytes(control + gzip.compress(tbuf.getvalue()))
+
+
+def test_symlink_members(tmp_path):
+    apk_a = tmp_path / "a.apk"
+    apk_b = tmp_path / "b.apk"
+    apk_with_symlink(apk_a, "hello-1.0")
+    apk_with_symlink(apk_b, "hello-1.1")
+
+    a = specialize_as(AlpineApkFile, FilesystemFile(str(apk_a)))
+    b = specialize_as(AlpineApkFile, FilesystemFile(str(apk_b)))
+    assert "usr/bin/link" in a.as_container.get_member_names()
+
+    # Packages differing only in a symlink target must show the change
+    diff = [
+        x for x in a.compare(b).details if x.source1.startswith("usr/bin/link")
+    ]
+    assert len(diff) == 1
+    assert "-destination: hello-1.0" in diff[0].unified_diff
+    assert "+destination: hello-1.1" in diff[0].unified_diff
+
+
+@pytest.fixture
+def differences(apk1, apk2):
+    return apk1.compare(apk2).details
+
+
+def test_metadata(differences):
+    diff = [x for x in differences if x.source1.startswith("apk-pkginfo")]
+    assert len(diff) == 1
+    assert "-pkgver = 1.0-r0" in diff[0].unified_diff
+    assert "+pkgver = 1.0-r1" in diff[0].unified_diff
+
+
+def test_content(differences):
+    sources = {x.source1 for x in differences}
+    assert "usr/bin/hello" in sources